@@ -6,8 +6,17 @@ to define global fixtures and command line options. Command line options can
 only be defined in this file.
 """
 
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
 import pytest
 
+if TYPE_CHECKING:
+    from collections.abc import Generator
+
+    from tests.v3.local_broker import LocalBroker
+
 
 def pytest_addoption(parser: pytest.Parser) -> None:
     """Define additional command lines to customise the examples."""
@@ -32,3 +41,21 @@ def pytest_runtest_setup(item: pytest.Item) -> None:
     """
     if "container" in item.keywords and not item.config.getoption("--container"):
         pytest.skip("need --container to run this test")
+
+
+@pytest.fixture(scope="session")
+def local_broker() -> Generator[LocalBroker, Any, None]:
+    """
+    Fixture to run an in-process Pact broker stand-in.
+
+    The broker implements the subset of the Pact Broker API used by the test
+    suites and examples. It is used whenever no `--broker-url` is given and
+    the tests are not run with `--container`.
+
+    The broker is imported lazily so that test runs which do not use it do not
+    depend on the test-support modules.
+    """
+    from tests.v3.local_broker import LocalBroker
+
+    with LocalBroker() as broker:
+        yield broker
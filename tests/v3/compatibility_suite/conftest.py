@@ -51,8 +51,11 @@ def broker_url(request: pytest.FixtureRequest) -> Generator[URL, Any, None]:
     it is assumed that the broker is already running and simply returns the
     given URL.
 
-    Otherwise, the Pact broker is started in a container. The URL of the
-    containerised broker is then returned.
+    If the `--container` option has been given, the Pact broker is started in a
+    container. The URL of the containerised broker is then returned.
+
+    Otherwise, an in-process stand-in for the broker is used (see the
+    `local_broker` fixture), which avoids the need for Docker.
     """
     broker_url: str | None = request.config.getoption("--broker-url")
 
@@ -62,6 +65,10 @@ def broker_url(request: pytest.FixtureRequest) -> Generator[URL, Any, None]:
         yield URL(broker_url)
         return
 
+    if not request.config.getoption("--container"):
+        yield request.getfixturevalue("local_broker").url
+        return
+
     with DockerCompose(
         Path(__file__).parent / "util",
         compose_file_name="pact-broker.yml",
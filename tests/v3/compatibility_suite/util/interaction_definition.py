@@ -129,10 +129,15 @@ class InteractionBody:
 
         The mime type is inferred from the file extension, and the contents
         are loaded as a byte array, and optionally as a string.
+
+        The file is read once, and the string is decoded from the byte array
+        with newlines normalised as they would be in text mode.
         """
         self.bytes = file.read_bytes()
         with contextlib.suppress(UnicodeDecodeError):
-            self.string = file.read_text()
+            self.string = (
+                self.bytes.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+            )
 
         if file.suffix == ".xml":
             self.mime_type = "application/xml"
@@ -0,0 +1,1124 @@
+"""
+In-process Pact Broker stand-in.
+
+Running the real Pact Broker requires Docker, a Postgres database and upwards
+of 30 seconds of start-up time. For the purposes of the test suites, only a
+small subset of the broker's [HAL](https://docs.pact.io/pact_broker/api) API is
+actually exercised:
+
+-   Publishing pacts, either through the `pb:publish-contracts` relation used
+    by the `pact-broker publish` CLI, or through the older `pb:publish-pact`
+    relation.
+-   Fetching pacts for verification (`pb:provider-pacts-for-verification`),
+    including support for the common consumer version selectors.
+-   Publishing verification results, and tagging or branching the provider
+    version beforehand.
+-   Deleting an integration, which is used to reset the broker between tests.
+
+This module implements that subset using only the standard library, with all
+data held in memory. The broker is started in a background thread and is
+typically accessed through the `local_broker` fixture defined in the root
+`conftest.py`:
+
+```python
+def test_publish(local_broker: LocalBroker) -> None:
+    PactBroker(local_broker.url).publish(pacts_dir)
+```
+
+The stand-in is deliberately lenient: authentication is accepted but not
+checked, and environments (and therefore the `deployed`, `released` and
+`deployedOrReleased` selectors) are not supported.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import itertools
+import json
+import logging
+import re
+import warnings
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from typing import TYPE_CHECKING, Any, Callable
+from urllib.parse import quote, unquote, urlsplit
+
+from typing_extensions import Self
+from yarl import URL
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from types import TracebackType
+
+logger = logging.getLogger(__name__)
+
+MAIN_BRANCH_CANDIDATES = ("develop", "main", "master")
+"""
+Branch names which are automatically promoted to a pacticipant's main branch.
+
+This mirrors the default behaviour of the Pact Broker.
+"""
+
+
+@dataclass
+class PacticipantVersion:
+    """
+    A version of a pacticipant (consumer or provider).
+    """
+
+    number: str
+    order: int
+    branches: set[str] = field(default_factory=set)
+    tags: set[str] = field(default_factory=set)
+
+
+@dataclass
+class Pacticipant:
+    """
+    A consumer or provider known to the broker.
+    """
+
+    name: str
+    main_branch: str | None = None
+    versions: dict[str, PacticipantVersion] = field(default_factory=dict)
+
+
+@dataclass
+class PactPublication:
+    """
+    A pact published for a specific consumer version.
+
+    The content of the pact is stored separately and is addressed by its
+    SHA-1 digest, such that identical pacts published for different consumer
+    versions share the same content and verification results.
+    """
+
+    consumer: str
+    provider: str
+    consumer_version: str
+    sha: str
+    order: int
+
+
+class LocalBrokerStore:
+    """
+    In-memory storage for the local broker.
+
+    All public methods are thread-safe, as the broker handles each request in
+    its own thread.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialise an empty store.
+        """
+        self._lock = Lock()
+        self._order = itertools.count()
+        self.pacticipants: dict[str, Pacticipant] = {}
+        self.publications: list[PactPublication] = []
+        self.contents: dict[str, dict[str, Any]] = {}
+        self.verification_results: dict[str, list[dict[str, Any]]] = {}
+
+    def reset(self) -> None:
+        """
+        Remove all data from the store.
+        """
+        with self._lock:
+            self.pacticipants.clear()
+            self.publications.clear()
+            self.contents.clear()
+            self.verification_results.clear()
+
+    def _pacticipant(self, name: str) -> Pacticipant:
+        if name not in self.pacticipants:
+            self.pacticipants[name] = Pacticipant(name)
+        return self.pacticipants[name]
+
+    def _version(self, pacticipant: str, number: str) -> PacticipantVersion:
+        versions = self._pacticipant(pacticipant).versions
+        if number not in versions:
+            versions[number] = PacticipantVersion(number, next(self._order))
+        return versions[number]
+
+    def pacticipant(self, name: str) -> Pacticipant | None:
+        """
+        Look up a pacticipant by name.
+        """
+        with self._lock:
+            return self.pacticipants.get(name)
+
+    def tag_version(self, pacticipant: str, number: str, tag: str) -> None:
+        """
+        Add a tag to a pacticipant version, creating the version if needed.
+        """
+        with self._lock:
+            self._version(pacticipant, number).tags.add(tag)
+
+    def branch_version(self, pacticipant: str, number: str, branch: str) -> None:
+        """
+        Add a version to a branch, creating the version if needed.
+
+        If the pacticipant has no main branch and the branch is one of the
+        [`MAIN_BRANCH_CANDIDATES`][tests.v3.local_broker.MAIN_BRANCH_CANDIDATES],
+        the branch becomes the main branch.
+        """
+        with self._lock:
+            self._version(pacticipant, number).branches.add(branch)
+            entry = self._pacticipant(pacticipant)
+            if entry.main_branch is None and branch in MAIN_BRANCH_CANDIDATES:
+                entry.main_branch = branch
+
+    def publish(
+        self,
+        consumer_version: str,
+        content: dict[str, Any],
+    ) -> PactPublication:
+        """
+        Store a pact for the given consumer version.
+
+        Publishing a pact for a consumer version which already has a pact with
+        the same provider replaces the previous pact.
+
+        Args:
+            consumer_version:
+                The version of the consumer which generated the pact.
+
+            content:
+                The pact document.
+
+        Returns:
+            The resulting publication.
+        """
+        consumer = content["consumer"]["name"]
+        provider = content["provider"]["name"]
+        content = {k: v for k, v in content.items() if k != "_links"}
+        sha = content_sha(content)
+
+        with self._lock:
+            self._version(consumer, consumer_version)
+            self._pacticipant(provider)
+            self.contents[sha] = content
+            self.publications = [
+                p
+                for p in self.publications
+                if (p.consumer, p.provider, p.consumer_version)
+                != (consumer, provider, consumer_version)
+            ]
+            publication = PactPublication(
+                consumer,
+                provider,
+                consumer_version,
+                sha,
+                next(self._order),
+            )
+            self.publications.append(publication)
+            return publication
+
+    def find(
+        self,
+        provider: str,
+        consumer: str | None = None,
+        predicate: Callable[[PactPublication, PacticipantVersion], bool] | None = None,
+    ) -> list[PactPublication]:
+        """
+        Find the publications for a provider.
+
+        Args:
+            provider:
+                The name of the provider.
+
+            consumer:
+                If given, only publications from this consumer are returned.
+
+            predicate:
+                If given, only publications for which the predicate returns
+                `True` are returned. The predicate is given the publication and
+                the consumer version.
+
+        Returns:
+            The matching publications, ordered from oldest to newest.
+        """
+        with self._lock:
+            return [
+                p
+                for p in self.publications
+                if p.provider == provider
+                and (consumer is None or p.consumer == consumer)
+                and (
+                    predicate is None
+                    or predicate(
+                        p,
+                        self.pacticipants[p.consumer].versions[p.consumer_version],
+                    )
+                )
+            ]
+
+    def add_verification_result(self, sha: str, result: dict[str, Any]) -> None:
+        """
+        Record a verification result against a pact.
+        """
+        with self._lock:
+            self.verification_results.setdefault(sha, []).append(result)
+
+    def has_successful_verification(self, sha: str) -> bool:
+        """
+        Check whether a pact has ever been verified successfully.
+
+        As with the Pact Broker, a pact leaves the pending state after its
+        first successful verification and never returns to it, even if later
+        verifications fail.
+        """
+        with self._lock:
+            return any(r["success"] for r in self.verification_results.get(sha, []))
+
+    def latest_verification_result(self, sha: str) -> dict[str, Any] | None:
+        """
+        Fetch the latest verification result for a pact, if any.
+        """
+        with self._lock:
+            results = self.verification_results.get(sha)
+            return results[-1] if results else None
+
+    def delete_integration(self, provider: str, consumer: str) -> None:
+        """
+        Delete all pacts and verification results between two pacticipants.
+        """
+        with self._lock:
+            removed = {
+                p.sha
+                for p in self.publications
+                if (p.provider, p.consumer) == (provider, consumer)
+            }
+            self.publications = [
+                p
+                for p in self.publications
+                if (p.provider, p.consumer) != (provider, consumer)
+            ]
+            for sha in removed - {p.sha for p in self.publications}:
+                self.contents.pop(sha, None)
+                self.verification_results.pop(sha, None)
+
+
+def content_sha(content: dict[str, Any]) -> str:
+    """
+    Compute the digest used to address a pact's content.
+    """
+    canonical = json.dumps(content, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()  # noqa: S324
+
+
+def select_pacts(
+    store: LocalBrokerStore,
+    provider: str,
+    selectors: list[dict[str, Any]],
+    provider_branch: str | None = None,
+) -> dict[str, tuple[PactPublication, list[str]]]:
+    """
+    Apply consumer version selectors.
+
+    Args:
+        store:
+            The store to query.
+
+        provider:
+            The name of the provider being verified.
+
+        selectors:
+            The consumer version selectors. If empty, the latest pact from
+            each consumer is selected.
+
+        provider_branch:
+            The branch of the provider, used by the `matchingBranch` selector.
+
+    Returns:
+        A mapping of the selected pact content digests to the most recent
+        publication of that content and descriptions of the selectors which
+        matched it.
+    """
+    selected: dict[str, tuple[PactPublication, list[str]]] = {}
+
+    def add(publications: Iterable[PactPublication], reason: str) -> None:
+        for publication in publications:
+            previous, reasons = selected.get(publication.sha, (publication, []))
+            if previous.order < publication.order:
+                previous = publication
+            selected[publication.sha] = (previous, [*reasons, reason])
+
+    for selector in selectors or [{"latest": True}]:
+        consumer: str | None = selector.get("consumer")
+        candidates = _select(store, provider, consumer, selector, provider_branch)
+        if not candidates and "fallbackTag" in selector:
+            candidates = _select(
+                store,
+                provider,
+                consumer,
+                {"tag": selector["fallbackTag"], "latest": True},
+                provider_branch,
+            )
+        if not candidates and "fallbackBranch" in selector:
+            candidates = _select(
+                store,
+                provider,
+                consumer,
+                {"branch": selector["fallbackBranch"]},
+                provider_branch,
+            )
+        add(candidates, _describe(selector))
+
+    return selected
+
+
+def _select(  # noqa: C901
+    store: LocalBrokerStore,
+    provider: str,
+    consumer: str | None,
+    selector: dict[str, Any],
+    provider_branch: str | None,
+) -> list[PactPublication]:
+    """
+    Find the publications matching a single selector.
+    """
+    latest: bool = selector.get("latest", False)
+    predicate: Callable[[PactPublication, PacticipantVersion], bool]
+
+    if selector.get("mainBranch"):
+        latest = True
+
+        def predicate(p: PactPublication, v: PacticipantVersion) -> bool:
+            entry = store.pacticipants[p.consumer]
+            return entry.main_branch is not None and entry.main_branch in v.branches
+
+    elif selector.get("matchingBranch"):
+        latest = True
+        if provider_branch is None:
+            return []
+
+        def predicate(_p: PactPublication, v: PacticipantVersion) -> bool:
+            return provider_branch in v.branches
+
+    elif "branch" in selector:
+        latest = selector.get("latest", True)
+
+        def predicate(_p: PactPublication, v: PacticipantVersion) -> bool:
+            return selector["branch"] in v.branches
+
+    elif "tag" in selector:
+
+        def predicate(_p: PactPublication, v: PacticipantVersion) -> bool:
+            return selector["tag"] in v.tags
+
+    elif "consumerVersion" in selector or "version" in selector:
+        number = selector.get("consumerVersion", selector.get("version"))
+
+        def predicate(p: PactPublication, _v: PacticipantVersion) -> bool:
+            return p.consumer_version == number
+
+    elif latest or set(selector) <= {"consumer"}:
+        latest = True
+
+        def predicate(_p: PactPublication, _v: PacticipantVersion) -> bool:
+            return True
+
+    else:
+        logger.warning("Unsupported consumer version selector: %r", selector)
+        return []
+
+    publications = store.find(provider, consumer, predicate)
+    if not latest:
+        return publications
+
+    latest_by_consumer: dict[str, PactPublication] = {}
+    for publication in publications:
+        latest_by_consumer[publication.consumer] = publication
+    return list(latest_by_consumer.values())
+
+
+def _describe(selector: dict[str, Any]) -> str:
+    """
+    Describe a selector in the same terms as the Pact Broker.
+    """
+    description = ", ".join(f"{k}={v}" for k, v in sorted(selector.items()))
+    return f"selector {{{description}}}" if selector else "latest"
+
+
+class LocalBroker:
+    """
+    In-process Pact Broker stand-in.
+
+    This is used as a context manager, with the broker listening for the
+    duration of the context:
+
+    ```python
+    with LocalBroker() as broker:
+        Verifier("provider").broker_source(broker.url)
+    ```
+    """
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 0,
+        *,
+        username: str | None = "pactbroker",
+        password: str | None = "pactbroker",  # noqa: S107
+    ) -> None:
+        """
+        Initialise the broker.
+
+        Args:
+            host:
+                The host on which the broker listens.
+
+            port:
+                The port on which the broker listens. If `0`, a free port is
+                chosen when the broker is started.
+
+            username:
+                The username included in the broker URL. Credentials are
+                accepted but never checked; they are only included so that
+                clients exercise their authentication code paths.
+
+            password:
+                The password included in the broker URL.
+        """
+        self._host = host
+        self._port = port
+        self._username = username
+        self._password = password
+
+        self.store = LocalBrokerStore()
+        self._server: LocalBrokerServer | None = None
+        self._thread: Thread | None = None
+
+    @property
+    def host(self) -> str:
+        """
+        Broker host.
+        """
+        return self._host
+
+    @property
+    def port(self) -> int:
+        """
+        Broker port.
+
+        If the broker was created with port `0`, this is only known once the
+        broker has been started.
+        """
+        if self._server:
+            return self._server.server_address[1]
+        return self._port
+
+    @property
+    def url(self) -> URL:
+        """
+        Broker URL, including the credentials.
+        """
+        url = URL(f"http://{self.host}:{self.port}")
+        if self._username:
+            url = url.with_user(self._username)
+        if self._password:
+            url = url.with_password(self._password)
+        return url
+
+    def reset(self) -> None:
+        """
+        Remove all pacticipants, pacts and verification results.
+        """
+        self.store.reset()
+
+    def __enter__(self) -> Self:
+        """
+        Start the broker.
+        """
+        self._server = LocalBrokerServer(
+            (self.host, self._port),
+            LocalBrokerRequestHandler,
+            store=self.store,
+        )
+        self._thread = Thread(
+            target=self._server.serve_forever,
+            name="Local Pact Broker",
+            daemon=True,
+        )
+        self._thread.start()
+        logger.info("Started local Pact Broker on %s", self.url)
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """
+        Stop the broker.
+        """
+        if not self._thread or not self._server:
+            warnings.warn(
+                "Exiting broker context despite broker not being started.",
+                stacklevel=2,
+            )
+            return
+
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self._server = None
+        self._thread = None
+
+
+class LocalBrokerServer(ThreadingHTTPServer):
+    """
+    HTTP server for the local broker.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        *args: Any,  # noqa: ANN401
+        store: LocalBrokerStore,
+        **kwargs: Any,  # noqa: ANN401
+    ) -> None:
+        """
+        Initialize the server.
+
+        Args:
+            store:
+                The store backing the broker.
+
+            *args:
+                Positional arguments to pass to the base `ThreadingHTTPServer`
+                class.
+
+            **kwargs:
+                Keyword arguments to pass to the base `ThreadingHTTPServer`
+                class.
+        """
+        self.store = store
+        super().__init__(*args, **kwargs)
+
+
+_Route = tuple[str, "re.Pattern[str]", str]
+
+_PACT = r"/pacts/provider/(?P<provider>[^/]+)/consumer/(?P<consumer>[^/]+)"
+_ROUTES: list[_Route] = [
+    ("GET", re.compile(r"/"), "_get_index"),
+    ("GET", re.compile(r"/diagnostic/status/heartbeat"), "_get_heartbeat"),
+    ("POST", re.compile(r"/contracts/publish"), "_post_contracts"),
+    ("PUT", re.compile(_PACT + r"/version/(?P<version>[^/]+)"), "_put_pact"),
+    ("GET", re.compile(_PACT + r"/version/(?P<version>[^/]+)"), "_get_pact"),
+    ("GET", re.compile(_PACT + r"/pact-version/(?P<sha>[0-9a-f]+)"), "_get_pact"),
+    ("GET", re.compile(_PACT + r"/latest(?:/(?P<tag>[^/]+))?"), "_get_pact"),
+    (
+        "POST",
+        re.compile(_PACT + r"/pact-version/(?P<sha>[0-9a-f]+)/verification-results"),
+        "_post_verification_results",
+    ),
+    (
+        "GET",
+        re.compile(
+            _PACT + r"/pact-version/(?P<sha>[0-9a-f]+)/verification-results/latest"
+        ),
+        "_get_verification_results",
+    ),
+    (
+        "GET",
+        re.compile(r"/pacts/provider/(?P<provider>[^/]+)/for-verification"),
+        "_get_for_verification",
+    ),
+    (
+        "POST",
+        re.compile(r"/pacts/provider/(?P<provider>[^/]+)/for-verification"),
+        "_post_for_verification",
+    ),
+    ("GET", re.compile(r"/pacticipants/(?P<name>[^/]+)"), "_get_pacticipant"),
+    (
+        "PUT",
+        re.compile(
+            r"/pacticipants/(?P<name>[^/]+)/versions/(?P<version>[^/]+)"
+            r"/tags/(?P<tag>[^/]+)"
+        ),
+        "_put_tag",
+    ),
+    (
+        "PUT",
+        re.compile(
+            r"/pacticipants/(?P<name>[^/]+)/branches/(?P<branch>[^/]+)"
+            r"/versions/(?P<version>[^/]+)"
+        ),
+        "_put_branch",
+    ),
+    (
+        "DELETE",
+        re.compile(
+            r"/integrations/provider/(?P<provider>[^/]+)/consumer/(?P<consumer>[^/]+)"
+        ),
+        "_delete_integration",
+    ),
+]
+
+
+class LocalBrokerRequestHandler(BaseHTTPRequestHandler):
+    """
+    Request handler for the local broker.
+
+    Requests are dispatched based on the method and path to one of the
+    `_get_*`, `_post_*`, `_put_*` or `_delete_*` methods, each of which returns
+    the status code and the JSON document to return.
+    """
+
+    if TYPE_CHECKING:
+        server: LocalBrokerServer
+
+    protocol_version = "HTTP/1.1"
+
+    def version_string(self) -> str:
+        """
+        Get the server version string.
+        """
+        return "Local Pact Broker"
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002, ANN401
+        """
+        Log requests through the module logger instead of stderr.
+        """
+        logger.debug(format, *args)
+
+    @property
+    def store(self) -> LocalBrokerStore:
+        """
+        The store backing the broker.
+        """
+        return self.server.store
+
+    @property
+    def base_url(self) -> str:
+        """
+        The base URL of the broker, as seen by the client.
+        """
+        host = self.headers.get("Host") or "{}:{}".format(*self.server.server_address)
+        return f"http://{host}"
+
+    def href(self, *segments: str) -> str:
+        """
+        Build an absolute URL from path segments.
+
+        Segments are percent-encoded, with the exception of `{...}` template
+        placeholders.
+        """
+        path = "/".join(s if s.startswith("{") else quote(s, safe="") for s in segments)
+        return f"{self.base_url}/{path}"
+
+    def _body(self) -> Any:  # noqa: ANN401
+        size = int(self.headers.get("Content-Length", 0))
+        data = self.rfile.read(size)
+        return json.loads(data) if data else {}
+
+    def _respond(self, status: int, body: Any = None) -> None:  # noqa: ANN401
+        data = json.dumps(body).encode("utf-8") if body is not None else b""
+        self.send_response(status)
+        if body is not None:
+            self.send_header("Content-Type", "application/hal+json;charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _dispatch(self) -> None:
+        path = urlsplit(self.path).path.rstrip("/") or "/"
+        for method, pattern, name in _ROUTES:
+            if method != self.command:
+                continue
+            if match := pattern.fullmatch(path):
+                kwargs = {k: unquote(v) for k, v in match.groupdict().items() if v}
+                try:
+                    status, body = getattr(self, name)(**kwargs)
+                except (KeyError, TypeError, ValueError) as e:
+                    logger.warning("Bad request to %s: %s", self.path, e)
+                    status, body = 400, {"error": str(e)}
+                self._respond(status, body)
+                return
+
+        logger.warning("No route for %s %s", self.command, self.path)
+        self._respond(404, {"error": f"No route for {self.command} {path}"})
+
+    do_GET = do_POST = do_PUT = do_DELETE = _dispatch  # noqa: N815
+
+    ############################################################################
+    ## Resources
+    ############################################################################
+
+    def _get_index(self) -> tuple[int, dict[str, Any]]:
+        return 200, {
+            "_links": {
+                "self": {"href": self.base_url, "title": "Index"},
+                "pb:publish-contracts": {
+                    "href": self.href("contracts", "publish"),
+                    "title": "Publish contracts",
+                },
+                "pb:publish-pact": {
+                    "href": self.href(
+                        "pacts",
+                        "provider",
+                        "{provider}",
+                        "consumer",
+                        "{consumer}",
+                        "version",
+                        "{consumerApplicationVersion}",
+                    ),
+                    "title": "Publish a pact",
+                    "templated": True,
+                },
+                "pb:latest-pact-versions": {
+                    "href": self.href("pacts", "latest"),
+                    "title": "Latest pact versions",
+                },
+                "pb:provider-pacts-for-verification": {
+                    "href": self.href(
+                        "pacts", "provider", "{provider}", "for-verification"
+                    ),
+                    "title": "Pact versions to be verified for the specified provider",
+                    "templated": True,
+                },
+                "pb:pacticipant": {
+                    "href": self.href("pacticipants", "{pacticipant}"),
+                    "title": "Fetch pacticipant by name",
+                    "templated": True,
+                },
+                "pb:pacticipant-version-tag": {
+                    "href": self.href(
+                        "pacticipants",
+                        "{pacticipant}",
+                        "versions",
+                        "{version}",
+                        "tags",
+                        "{tag}",
+                    ),
+                    "title": "Get, create or delete a tag for a pacticipant version",
+                    "templated": True,
+                },
+                "pb:pacticipant-branch-version": {
+                    "href": self.href(
+                        "pacticipants",
+                        "{pacticipant}",
+                        "branches",
+                        "{branch}",
+                        "versions",
+                        "{version}",
+                    ),
+                    "title": "Get or add/create a version for a pacticipant branch",
+                    "templated": True,
+                },
+            },
+        }
+
+    def _get_heartbeat(self) -> tuple[int, dict[str, Any]]:
+        return 200, {"ok": True}
+
+    def _post_contracts(self) -> tuple[int, dict[str, Any]]:
+        body = self._body()
+        name: str = body["pacticipantName"]
+        version: str = body["pacticipantVersionNumber"]
+        notices: list[dict[str, str]] = []
+
+        for tag in body.get("tags", []):
+            self.store.tag_version(name, version, tag)
+        if branch := body.get("branch"):
+            self.store.branch_version(name, version, branch)
+
+        contracts = []
+        for contract in body.get("contracts", []):
+            content = json.loads(base64.b64decode(contract["content"]))
+            publication = self.store.publish(version, content)
+            contracts.append({
+                "href": self._pact_href(publication),
+                "name": self._pact_name(publication),
+            })
+            notices.append({
+                "type": "success",
+                "text": f"Pact successfully published for {name} version {version}"
+                f" and provider {publication.provider}.",
+            })
+
+        return 200, {
+            "notices": notices,
+            "logs": [{"level": "info", "message": n["text"]} for n in notices],
+            "_embedded": {
+                "pacticipant": {"name": name},
+                "version": {"number": version},
+            },
+            "_links": {
+                "pb:pacticipant-version": {
+                    "href": self.href("pacticipants", name, "versions", version),
+                    "name": version,
+                },
+                "pb:contracts": contracts,
+            },
+        }
+
+    def _put_pact(
+        self,
+        provider: str,
+        consumer: str,
+        version: str,
+    ) -> tuple[int, dict[str, Any]]:
+        content = self._body()
+        if (
+            content["provider"]["name"] != provider
+            or content["consumer"]["name"] != consumer
+        ):
+            return 400, {"error": "Pacticipant names do not match the URL"}
+        publication = self.store.publish(version, content)
+        return 201, self._pact_document(publication)
+
+    def _get_pact(
+        self,
+        provider: str,
+        consumer: str,
+        version: str | None = None,
+        sha: str | None = None,
+        tag: str | None = None,
+    ) -> tuple[int, dict[str, Any]]:
+        def predicate(p: PactPublication, v: PacticipantVersion) -> bool:
+            return (
+                (version is None or p.consumer_version == version)
+                and (sha is None or p.sha == sha)
+                and (tag is None or tag in v.tags)
+            )
+
+        publications = self.store.find(provider, consumer, predicate)
+        if not publications:
+            return 404, {"error": "No pact found"}
+        return 200, self._pact_document(publications[-1])
+
+    def _get_for_verification(self, provider: str) -> tuple[int, dict[str, Any]]:
+        return 200, {
+            "_links": {
+                "self": {
+                    "href": self.href(
+                        "pacts", "provider", provider, "for-verification"
+                    ),
+                    "title": "Pacts to be verified",
+                },
+            },
+        }
+
+    def _post_for_verification(self, provider: str) -> tuple[int, dict[str, Any]]:
+        body = self._body()
+        selected = select_pacts(
+            self.store,
+            provider,
+            body.get("consumerVersionSelectors", []),
+            body.get("providerVersionBranch"),
+        )
+        include_pending = body.get("includePendingStatus", False)
+
+        pacts = []
+        for publication, reasons in sorted(
+            selected.values(),
+            key=lambda item: item[0].order,
+        ):
+            pending = include_pending and not self.store.has_successful_verification(
+                publication.sha
+            )
+            notices = [
+                {
+                    "when": "before_verification",
+                    "text": f"The pact at {self._pact_href(publication)} is being"
+                    f" verified because it matches the following configured"
+                    f" selection criterion: {reason}",
+                }
+                for reason in reasons
+            ]
+            if include_pending:
+                notices.append({
+                    "when": "before_verification",
+                    "text": "This pact is in pending state."
+                    if pending
+                    else "This pact is not in pending state.",
+                })
+            pacts.append({
+                "shortDescription": "; ".join(reasons),
+                "verificationProperties": {
+                    "pending": pending,
+                    "notices": notices,
+                },
+                "_links": {
+                    "self": {
+                        "href": self._pact_href(publication),
+                        "name": self._pact_name(publication),
+                    },
+                },
+            })
+
+        return 200, {
+            "_embedded": {"pacts": pacts},
+            "_links": {
+                "self": {
+                    "href": self.href(
+                        "pacts", "provider", provider, "for-verification"
+                    ),
+                    "title": "Pacts to be verified",
+                },
+            },
+        }
+
+    def _post_verification_results(
+        self,
+        provider: str,
+        consumer: str,
+        sha: str,
+    ) -> tuple[int, dict[str, Any]]:
+        if not self.store.find(provider, consumer, lambda p, _v: p.sha == sha):
+            return 404, {"error": "No pact found"}
+        result = self._body()
+        result["verificationDate"] = datetime.now(tz=timezone.utc).isoformat()
+        result["_links"] = {
+            "self": {
+                "href": self.href(
+                    "pacts",
+                    "provider",
+                    provider,
+                    "consumer",
+                    consumer,
+                    "pact-version",
+                    sha,
+                    "verification-results",
+                    "latest",
+                ),
+            },
+        }
+        self.store.add_verification_result(sha, result)
+        return 201, result
+
+    def _get_verification_results(
+        self,
+        provider: str,
+        consumer: str,
+        sha: str,
+    ) -> tuple[int, dict[str, Any]]:
+        if not self.store.find(provider, consumer, lambda p, _v: p.sha == sha):
+            return 404, {"error": "No pact found"}
+        result = self.store.latest_verification_result(sha)
+        if result is None:
+            return 404, {"error": "No verification results found"}
+        return 200, result
+
+    def _get_pacticipant(self, name: str) -> tuple[int, dict[str, Any]]:
+        pacticipant = self.store.pacticipant(name)
+        if pacticipant is None:
+            return 404, {"error": f"No pacticipant named {name!r}"}
+        return 200, {
+            "name": pacticipant.name,
+            "mainBranch": pacticipant.main_branch,
+            "_links": {
+                "self": {"href": self.href("pacticipants", name), "name": name},
+                "pb:version-tag": {
+                    "href": self.href(
+                        "pacticipants", name, "versions", "{version}", "tags", "{tag}"
+                    ),
+                    "templated": True,
+                },
+                "pb:branch-version": {
+                    "href": self.href(
+                        "pacticipants",
+                        name,
+                        "branches",
+                        "{branch}",
+                        "versions",
+                        "{version}",
+                    ),
+                    "templated": True,
+                },
+            },
+        }
+
+    def _put_tag(self, name: str, version: str, tag: str) -> tuple[int, dict[str, Any]]:
+        self.store.tag_version(name, version, tag)
+        return 201, {"name": tag}
+
+    def _put_branch(
+        self,
+        name: str,
+        branch: str,
+        version: str,
+    ) -> tuple[int, dict[str, Any]]:
+        self.store.branch_version(name, version, branch)
+        return 201, {"name": branch, "number": version}
+
+    def _delete_integration(
+        self,
+        provider: str,
+        consumer: str,
+    ) -> tuple[int, None]:
+        self.store.delete_integration(provider, consumer)
+        return 204, None
+
+    ############################################################################
+    ## Helpers
+    ############################################################################
+
+    def _pact_href(self, publication: PactPublication) -> str:
+        return self.href(
+            "pacts",
+            "provider",
+            publication.provider,
+            "consumer",
+            publication.consumer,
+            "pact-version",
+            publication.sha,
+        )
+
+    @staticmethod
+    def _pact_name(publication: PactPublication) -> str:
+        return (
+            f"Pact between {publication.consumer} ({publication.consumer_version})"
+            f" and {publication.provider}"
+        )
+
+    def _pact_document(self, publication: PactPublication) -> dict[str, Any]:
+        """
+        Render a pact with its HAL links.
+
+        Each interaction is given an `_id` (derived from its content) which is
+        used by the verifier to identify the interaction in the verification
+        results.
+        """
+        content = json.loads(json.dumps(self.store.contents[publication.sha]))
+        for key in ("interactions", "messages"):
+            for interaction in content.get(key, []):
+                interaction.setdefault("_id", content_sha(interaction))
+
+        pact_href = self._pact_href(publication)
+        content["_links"] = {
+            "self": {"href": pact_href, "name": self._pact_name(publication)},
+            "pb:consumer": {
+                "href": self.href("pacticipants", publication.consumer),
+                "name": publication.consumer,
+            },
+            "pb:provider": {
+                "href": self.href("pacticipants", publication.provider),
+                "name": publication.provider,
+            },
+            "pb:consumer-version": {
+                "href": self.href(
+                    "pacticipants",
+                    publication.consumer,
+                    "versions",
+                    publication.consumer_version,
+                ),
+                "name": publication.consumer_version,
+            },
+            "pb:publish-verification-results": {
+                "href": f"{pact_href}/verification-results",
+                "title": "Publish verification results",
+            },
+            "pb:latest-verification-results": {
+                "href": f"{pact_href}/verification-results/latest",
+            },
+        }
+        return content
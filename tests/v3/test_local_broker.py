@@ -0,0 +1,410 @@
+"""
+Tests of the in-process Pact Broker stand-in.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+from typing import TYPE_CHECKING, Any
+
+import pytest
+import requests
+
+from tests.v3.local_broker import LocalBroker
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+
+
+@pytest.fixture(scope="module")
+def _broker() -> Generator[LocalBroker, Any, None]:
+    with LocalBroker() as broker:
+        yield broker
+
+
+@pytest.fixture
+def broker(_broker: LocalBroker) -> LocalBroker:
+    _broker.reset()
+    return _broker
+
+
+def url(broker: LocalBroker, *segments: str) -> str:
+    return str(broker.url.with_user(None).joinpath(*segments))
+
+
+def pact(consumer: str, version: str) -> dict[str, Any]:
+    """
+    Build a minimal pact, with content unique to the consumer version.
+    """
+    return {
+        "consumer": {"name": consumer},
+        "provider": {"name": "provider"},
+        "interactions": [
+            {
+                "description": f"interaction from {version}",
+                "request": {"method": "GET", "path": "/"},
+                "response": {"status": 200},
+            }
+        ],
+        "metadata": {"pactSpecification": {"version": "2.0.0"}},
+    }
+
+
+def publish(
+    broker: LocalBroker,
+    consumer: str,
+    version: str,
+    *,
+    branch: str | None = None,
+    tags: list[str] | None = None,
+) -> requests.Response:
+    body: dict[str, Any] = {
+        "pacticipantName": consumer,
+        "pacticipantVersionNumber": version,
+        "tags": tags or [],
+        "contracts": [
+            {
+                "consumerName": consumer,
+                "providerName": "provider",
+                "specification": "pact",
+                "contentType": "application/json",
+                "content": base64.b64encode(
+                    json.dumps(pact(consumer, version)).encode()
+                ).decode(),
+            }
+        ],
+    }
+    if branch:
+        body["branch"] = branch
+    response = requests.post(url(broker, "contracts", "publish"), json=body, timeout=2)
+    response.raise_for_status()
+    return response
+
+
+def for_verification(
+    broker: LocalBroker,
+    selectors: list[dict[str, Any]] | None = None,
+    **kwargs: Any,  # noqa: ANN401
+) -> list[dict[str, Any]]:
+    response = requests.post(
+        url(broker, "pacts", "provider", "provider", "for-verification"),
+        json={"consumerVersionSelectors": selectors or [], **kwargs},
+        timeout=2,
+    )
+    response.raise_for_status()
+    return response.json()["_embedded"]["pacts"]
+
+
+def selected(
+    broker: LocalBroker,
+    *selectors: dict[str, Any],
+    **kwargs: Any,  # noqa: ANN401
+) -> list[str]:
+    """
+    Return the names of the pacts selected for verification.
+    """
+    return [
+        p["_links"]["self"]["name"]
+        for p in for_verification(broker, list(selectors), **kwargs)
+    ]
+
+
+def verify(pact_href: str, *, success: bool) -> None:
+    response = requests.get(pact_href, timeout=2)
+    response.raise_for_status()
+    links = response.json()["_links"]
+    response = requests.post(
+        links["pb:publish-verification-results"]["href"],
+        json={"success": success, "providerApplicationVersion": "1.0.0"},
+        timeout=2,
+    )
+    assert response.status_code == 201
+
+
+def name(consumer: str, version: str) -> str:
+    return f"Pact between {consumer} ({version}) and provider"
+
+
+def test_index(broker: LocalBroker) -> None:
+    response = requests.get(url(broker), timeout=2)
+    assert response.status_code == 200
+    assert response.headers["Content-Type"].startswith("application/hal+json")
+    links = response.json()["_links"]
+    assert "pb:publish-contracts" in links
+    assert links["pb:provider-pacts-for-verification"]["templated"]
+
+
+def test_publish_contracts(broker: LocalBroker) -> None:
+    response = publish(broker, "consumer", "1.0.0", branch="main", tags=["prod"])
+    data = response.json()
+    assert data["notices"][0]["type"] == "success"
+    assert len(data["_links"]["pb:contracts"]) == 1
+
+    response = requests.get(url(broker, "pacticipants", "consumer"), timeout=2)
+    assert response.json()["mainBranch"] == "main"
+
+    response = requests.get(
+        url(broker, "pacts", "provider", "provider", "consumer", "consumer", "latest"),
+        timeout=2,
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["interactions"][0]["_id"]
+    assert "pb:publish-verification-results" in data["_links"]
+
+
+def test_put_pact(broker: LocalBroker) -> None:
+    pact_url = url(
+        broker, "pacts", "provider", "provider", "consumer", "consumer", "version", "1"
+    )
+    response = requests.put(pact_url, json=pact("consumer", "1"), timeout=2)
+    assert response.status_code == 201
+    assert requests.get(pact_url, timeout=2).status_code == 200
+    assert selected(broker) == [name("consumer", "1")]
+
+
+def test_put_pact_mismatched_names(broker: LocalBroker) -> None:
+    response = requests.put(
+        url(
+            broker, "pacts", "provider", "provider", "consumer", "other", "version", "1"
+        ),
+        json=pact("consumer", "1"),
+        timeout=2,
+    )
+    assert response.status_code == 400
+    assert selected(broker) == []
+
+
+def test_not_found(broker: LocalBroker) -> None:
+    assert requests.get(url(broker, "unknown"), timeout=2).status_code == 404
+    assert requests.get(url(broker, "pacticipants", "x"), timeout=2).status_code == 404
+    response = requests.get(
+        url(broker, "pacts", "provider", "provider", "consumer", "consumer", "latest"),
+        timeout=2,
+    )
+    assert response.status_code == 404
+
+
+def test_bad_request(broker: LocalBroker) -> None:
+    response = requests.post(url(broker, "contracts", "publish"), json={}, timeout=2)
+    assert response.status_code == 400
+
+
+def test_tag_and_branch_put(broker: LocalBroker) -> None:
+    publish(broker, "consumer", "1")
+    response = requests.put(
+        url(broker, "pacticipants", "consumer", "versions", "1", "tags", "prod"),
+        json={},
+        timeout=2,
+    )
+    assert response.status_code == 201
+    response = requests.put(
+        url(broker, "pacticipants", "consumer", "branches", "main", "versions", "1"),
+        json={},
+        timeout=2,
+    )
+    assert response.status_code == 201
+
+    assert selected(broker, {"tag": "prod"}) == [name("consumer", "1")]
+    assert selected(broker, {"mainBranch": True}) == [name("consumer", "1")]
+
+
+def test_selector_default(broker: LocalBroker) -> None:
+    publish(broker, "a", "1")
+    publish(broker, "a", "2")
+    publish(broker, "b", "1")
+    assert selected(broker) == [name("a", "2"), name("b", "1")]
+
+
+def test_selector_latest(broker: LocalBroker) -> None:
+    publish(broker, "a", "1")
+    publish(broker, "a", "2")
+    assert selected(broker, {"latest": True}) == [name("a", "2")]
+
+
+def test_selector_consumer(broker: LocalBroker) -> None:
+    publish(broker, "a", "1")
+    publish(broker, "b", "1")
+    assert selected(broker, {"consumer": "b"}) == [name("b", "1")]
+
+
+def test_selector_tag(broker: LocalBroker) -> None:
+    publish(broker, "a", "1", tags=["prod"])
+    publish(broker, "a", "2", tags=["prod"])
+    publish(broker, "a", "3")
+    assert selected(broker, {"tag": "prod"}) == [name("a", "1"), name("a", "2")]
+    assert selected(broker, {"tag": "prod", "latest": True}) == [name("a", "2")]
+
+
+def test_selector_fallback_tag(broker: LocalBroker) -> None:
+    publish(broker, "a", "1", tags=["main"])
+    publish(broker, "a", "2", tags=["main"])
+    assert selected(broker, {"tag": "feat", "fallbackTag": "main"}) == [name("a", "2")]
+
+
+def test_selector_branch(broker: LocalBroker) -> None:
+    publish(broker, "a", "1", branch="feat")
+    publish(broker, "a", "2", branch="feat")
+    publish(broker, "a", "3", branch="other")
+    assert selected(broker, {"branch": "feat"}) == [name("a", "2")]
+
+
+def test_selector_fallback_branch(broker: LocalBroker) -> None:
+    publish(broker, "a", "1", branch="main")
+    assert selected(broker, {"branch": "feat", "fallbackBranch": "main"}) == [
+        name("a", "1")
+    ]
+
+
+def test_selector_main_branch(broker: LocalBroker) -> None:
+    publish(broker, "a", "1", branch="master")
+    publish(broker, "a", "2", branch="feat")
+    publish(broker, "b", "1", branch="feat")
+    assert selected(broker, {"mainBranch": True}) == [name("a", "1")]
+
+
+def test_selector_matching_branch(broker: LocalBroker) -> None:
+    publish(broker, "a", "1", branch="feat")
+    publish(broker, "a", "2", branch="main")
+    assert selected(broker, {"matchingBranch": True}) == []
+    assert selected(broker, {"matchingBranch": True}, providerVersionBranch="feat") == [
+        name("a", "1")
+    ]
+
+
+def test_selector_consumer_version(broker: LocalBroker) -> None:
+    publish(broker, "a", "1")
+    publish(broker, "a", "2")
+    assert selected(broker, {"consumer": "a", "consumerVersion": "1"}) == [
+        name("a", "1")
+    ]
+
+
+def test_selector_unsupported(broker: LocalBroker) -> None:
+    publish(broker, "a", "1")
+    assert selected(broker, {"deployedOrReleased": True}) == []
+
+
+def test_selectors_deduplicate(broker: LocalBroker) -> None:
+    publish(broker, "a", "1", branch="main", tags=["prod"])
+    pacts = for_verification(broker, [{"mainBranch": True}, {"tag": "prod"}])
+    assert len(pacts) == 1
+    assert "mainBranch=True" in pacts[0]["shortDescription"]
+    assert "tag=prod" in pacts[0]["shortDescription"]
+
+
+def test_pending(broker: LocalBroker) -> None:
+    publish(broker, "a", "1")
+
+    def pending() -> bool:
+        (entry,) = for_verification(broker, includePendingStatus=True)
+        return entry["verificationProperties"]["pending"]
+
+    (entry,) = for_verification(broker)
+    assert not entry["verificationProperties"]["pending"]
+    pact_href = entry["_links"]["self"]["href"]
+
+    assert pending()
+    verify(pact_href, success=False)
+    assert pending()
+    verify(pact_href, success=True)
+    assert not pending()
+    verify(pact_href, success=False)
+    assert not pending()
+
+
+def test_verification_results(broker: LocalBroker) -> None:
+    publish(broker, "a", "1")
+    (entry,) = for_verification(broker)
+    pact_href = entry["_links"]["self"]["href"]
+    latest = requests.get(pact_href, timeout=2).json()["_links"][
+        "pb:latest-verification-results"
+    ]["href"]
+
+    assert requests.get(latest, timeout=2).status_code == 404
+    verify(pact_href, success=True)
+    response = requests.get(latest, timeout=2)
+    assert response.status_code == 200
+    assert response.json()["success"]
+
+    response = requests.post(
+        url(
+            broker,
+            "pacts",
+            "provider",
+            "provider",
+            "consumer",
+            "a",
+            "pact-version",
+            "0" * 40,
+            "verification-results",
+        ),
+        json={"success": True},
+        timeout=2,
+    )
+    assert response.status_code == 404
+
+
+def test_delete_integration(broker: LocalBroker) -> None:
+    publish(broker, "a", "1")
+    publish(broker, "b", "1")
+    (entry,) = for_verification(broker, [{"consumer": "b"}])
+    verify(entry["_links"]["self"]["href"], success=True)
+
+    response = requests.delete(
+        url(broker, "integrations", "provider", "provider", "consumer", "a"),
+        timeout=2,
+    )
+    assert response.status_code == 204
+
+    assert selected(broker) == [name("b", "1")]
+    (entry,) = for_verification(broker, includePendingStatus=True)
+    assert not entry["verificationProperties"]["pending"]
+    response = requests.get(
+        url(broker, "pacts", "provider", "provider", "consumer", "a", "latest"),
+        timeout=2,
+    )
+    assert response.status_code == 404
+
+
+def test_delete_integration_keeps_shared_content(broker: LocalBroker) -> None:
+    content = pact("a", "1")
+    for version in ("1", "2"):
+        requests.put(
+            url(
+                broker,
+                "pacts",
+                "provider",
+                "provider",
+                "consumer",
+                "a",
+                "version",
+                version,
+            ),
+            json=content,
+            timeout=2,
+        ).raise_for_status()
+    (entry,) = for_verification(broker)
+    assert entry["_links"]["self"]["name"] == name("a", "2")
+    verify(entry["_links"]["self"]["href"], success=True)
+
+    # Republishing version 2 with new content leaves version 1 as the only
+    # publication of the original (verified) content.
+    requests.put(
+        url(broker, "pacts", "provider", "provider", "consumer", "a", "version", "2"),
+        json=pact("a", "2"),
+        timeout=2,
+    ).raise_for_status()
+    response = requests.get(
+        url(broker, "pacts", "provider", "provider", "consumer", "a", "version", "1"),
+        timeout=2,
+    )
+    assert response.status_code == 200
+
+    requests.delete(
+        url(broker, "integrations", "provider", "provider", "consumer", "a"),
+        timeout=2,
+    ).raise_for_status()
+    assert broker.store.contents == {}
+    assert broker.store.verification_results == {}